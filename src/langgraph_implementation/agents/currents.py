@@ -1,13 +1,25 @@
-import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
+import requests
 from langchain_core.messages import HumanMessage
-from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel
 
 from graph.state import AgentState, show_agent_reasoning
-from utils.api import get_tidal_data
-from utils.llm import call_llm
+from utils import fast_json
+from utils.api import (
+    get_lat_lon,
+    get_noaa_stations,
+    get_tidal_data,
+    noaa_date_range,
+)
+from utils.geo import haversine_miles, nearest_indices
+
+log = logging.getLogger(__name__)
+
+# Long-lived pool for NOAA station probes, shared across planner runs
+station_probes = ThreadPoolExecutor(max_workers=8)
 
 
 class WaterCurrent(BaseModel):
@@ -18,47 +30,53 @@ class WaterCurrent(BaseModel):
 
 
 class NOAAStations(BaseModel):
-    station_ids: List[int]
+    station_ids: List[str]
     station_names: List[str]
     station_distances: List[float]
 
 
-def current_agent(state: AgentState):
-    trip_data = state["data"]
+def fetch_tides_data(station_ids: List[str], start_date: str):
+    """Probe all stations at once and keep the closest one that returns data."""
     tides_data = {}
-    for station_id in trip_data["analyst_signals"]["noaa_agent"]["noaa_station_ids"]:
-        print(f"trying NOAA station: {station_id}")
-        http_code, tides_data = get_tidal_data(
-            noaa_id=station_id, start_date=trip_data["start_date"]
-        )
+    begin_date, end_date = noaa_date_range(start_date)
+    futures = [
+        station_probes.submit(get_tidal_data, station_id, begin_date, end_date)
+        for station_id in station_ids
+    ]
+    # Stations are ordered closest first, so walk the futures in that order
+    for station_id, future in zip(station_ids, futures):
+        log.debug("Trying NOAA station: %s", station_id)
+        try:
+            http_code, tides_data = future.result()
+        except requests.RequestException as e:
+            # One unreachable station shouldn't sink the others already answered
+            log.warning("NOAA station %s failed: %s", station_id, e)
+            tides_data = {}
+            continue
         if http_code == 200:
             break
-        else:
-            pass
-
-    print("Pulled some NOAA data...")
-    print(tides_data)
-    current_analysis = generate_current_predictions(
-        location=trip_data["location"],
-        tides_data=tides_data,
-        start_date=trip_data["start_date"],
-    )
-    current_analysis_dict = {
-        "confidence": current_analysis.confidence,
-        "reasoning": current_analysis.reasoning,
-        "current_speed": current_analysis.current_speed,
-        "currend_direction": current_analysis.current_direction,
+    # Don't leave farther stations queued once one has answered
+    for pending in futures:
+        pending.cancel()
+    return tides_data
+
+
+def summarize_tides(tides_data: Dict) -> Dict:
+    """Trim NOAA tide predictions to hourly samples plus the day's high and low."""
+    predictions = tides_data.get("predictions")
+    if not predictions:
+        return tides_data
+
+    hourly = [
+        {"t": prediction["t"], "v": prediction["v"]}
+        for prediction in predictions
+        if prediction["t"].endswith(":00")
+    ]
+    return {
+        "predictions": hourly,
+        "high": max(predictions, key=lambda prediction: float(prediction["v"])),
+        "low": min(predictions, key=lambda prediction: float(prediction["v"])),
     }
-    message = HumanMessage(
-        content=json.dumps(current_analysis_dict), name="current_agent"
-    )
-
-    show_agent_reasoning(current_analysis_dict, "Current Agent")
-
-    # Store signals in the overall state
-    state["data"]["analyst_signals"]["current_agent"] = current_analysis_dict
-
-    return {"messages": [message], "data": state["data"]}
 
 
 def noaa_agent(state: AgentState):
@@ -69,7 +87,7 @@ def noaa_agent(state: AgentState):
         "noaa_station_names": noaa_station.station_names,
         "noaa_station_distances": noaa_station.station_distances,
     }
-    message = HumanMessage(content=json.dumps(station_dict), name="noaa_agent")
+    message = HumanMessage(content=fast_json.dumps(station_dict), name="noaa_agent")
     show_agent_reasoning(station_dict, "NOAA Agent")
 
     state["data"]["analyst_signals"]["noaa_agent"] = station_dict
@@ -77,68 +95,21 @@ def noaa_agent(state: AgentState):
     return {"messages": [message], "data": state["data"]}
 
 
-def closest_noaa_stations(location: str):
-    template = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """Provide a list of the NOAA water levels stations closest to {location}. 
-                Order response by distance from clostest for furthest. 
-                """,
-            ),
-            (
-                "human",
-                """What are the closest 8 NOAA station to {location}?
-
-                Return JSON exactly in this format:
-                {{
-                "station_ids": List[int],
-                "station_names": List[str],
-                "station_distances": List[float]
-                }}
-                """,
-            ),
-        ]
-    )
-    prompt = template.invoke({"location": location})
-    return call_llm(prompt=prompt, pydantic_model=NOAAStations)
-
-
-def generate_current_predictions(
-    location: str, tides_data: Dict, start_date: str, end_date: str = None
-):
-
-    template = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """You are a seasoned sailor analyzing local NOAA tides and current data for {location}.
-                trying to understand how your planned trip for {start_date} will be effected.
-
-                Analyze tides and current data {tides_data} for {location} on {start_date}.
-                
-                Make sure to include in your reasoning response the following:
-                - Max current speed
-                - Compass direction of current
-                - Time of Ebb and Flow
-                """,
-            ),
-            (
-                "human",
-                """Aggregate {tides_data} for {location} on {start_date}
-
-                Return JSON exactly in this format:
-                {{
-                "current_speed": "low" to "high" in knots,
-                "current_direction": "compass direction and "ebb or flow"
-                "confidence": float (0-100),
-                "reasoning": "string"
-                }}
-                """,
-            ),
-        ]
-    )
-    prompt = template.invoke(
-        {"location": location, "tides_data": tides_data, "start_date": start_date}
+def closest_noaa_stations(location: str, max_results: int = 8):
+    """Find the NOAA tide stations nearest to a location, closest first."""
+    lat_lon = get_lat_lon(location)
+    if not lat_lon:
+        return NOAAStations(station_ids=[], station_names=[], station_distances=[])
+
+    try:
+        stations = get_noaa_stations()
+    except (requests.RequestException, ValueError, KeyError) as e:
+        log.warning("Could not load NOAA stations: %s", e)
+        return NOAAStations(station_ids=[], station_names=[], station_distances=[])
+    distances = haversine_miles(lat_lon, stations["lat"], stations["lon"])
+    nearest = nearest_indices(distances, max_results)
+    return NOAAStations(
+        station_ids=stations["ids"][nearest].tolist(),
+        station_names=stations["names"][nearest].tolist(),
+        station_distances=distances[nearest].tolist(),
     )
-    return call_llm(prompt=prompt, pydantic_model=WaterCurrent)
@@ -0,0 +1,112 @@
+import logging
+from typing import Dict
+
+from langchain_core.messages import HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from agents.currents import WaterCurrent, fetch_tides_data, summarize_tides
+from agents.weather import WeatherPrediction
+from agents.wind import WindPredictions
+from graph.state import AgentState, show_agent_reasoning
+from utils import fast_json
+from utils.llm import call_llm
+
+log = logging.getLogger(__name__)
+
+
+class TripForecast(BaseModel):
+    wind: WindPredictions
+    weather: WeatherPrediction
+    current: WaterCurrent
+
+
+def forecast_agent(state: AgentState):
+    """Produce the wind, weather and current signals from a single LLM call."""
+    trip_data = state["data"]
+    tides_data = summarize_tides(
+        fetch_tides_data(
+            trip_data["analyst_signals"]["noaa_agent"]["noaa_station_ids"],
+            start_date=trip_data["start_date"],
+        )
+    )
+
+    log.debug("Pulled NOAA tides data: %s", tides_data)
+    forecast = generate_trip_forecast(
+        location=trip_data["location"],
+        tides_data=tides_data,
+        start_date=trip_data["start_date"],
+    )
+
+    # Split the combined forecast back into one signal per crew member
+    signals = {
+        "wind_agent": forecast.wind.model_dump(),
+        "weather_agent": forecast.weather.model_dump(),
+        "current_agent": forecast.current.model_dump(),
+    }
+    messages = []
+    for agent_name, signal in signals.items():
+        messages.append(HumanMessage(content=fast_json.dumps(signal), name=agent_name))
+        show_agent_reasoning(signal, agent_name.replace("_", " ").title())
+
+        # Store signals in the overall state
+        state["data"]["analyst_signals"][agent_name] = signal
+
+    return {"messages": messages, "data": state["data"]}
+
+
+TRIP_FORECAST_TEMPLATE = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are a seasoned sailor and meteorologist preparing the forecast your
+            captain needs to decide whether to sail on a planned trip.
+
+            Make sure to include in your reasoning response the following:
+            - Wind: wind speed, wind gust speed and wind compass direction
+            - Weather: temperature forecast low and high, rain forecast
+            - Currents: max current speed, compass direction of current and time of
+            Ebb and Flow from the NOAA tides and current data
+            """,
+        ),
+        (
+            "human",
+            """Aggregate wind forecast, weather and the NOAA tides and current data
+            {tides_data} for {location} on {start_date}
+
+            Return JSON exactly in this format:
+            {{
+            "wind": {{
+                "wind_strength": "low" to "high" in knots,
+                "wind_direction": "compass direction",
+                "confidence": float (0-100),
+                "reasoning": "string"
+            }},
+            "weather": {{
+                "temperature": "low" to "high" in Fahrenheit,
+                "rain_forecast": "string",
+                "confidence": float (0-100),
+                "reasoning": "string"
+            }},
+            "current": {{
+                "current_speed": "low" to "high" in knots,
+                "current_direction": "compass direction and "ebb or flow",
+                "confidence": float (0-100),
+                "reasoning": "string"
+            }}
+            }}
+            """,
+        ),
+    ]
+)
+
+
+def generate_trip_forecast(location: str, tides_data: Dict, start_date: str):
+    prompt = TRIP_FORECAST_TEMPLATE.invoke(
+        {
+            "location": location,
+            "tides_data": fast_json.dumps(tides_data),
+            "start_date": start_date,
+        }
+    )
+    return call_llm(prompt=prompt, pydantic_model=TripForecast)
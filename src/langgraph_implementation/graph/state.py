@@ -1,10 +1,11 @@
-import json
-import operator
 from typing import Dict
 
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
 from typing_extensions import Annotated, Sequence, TypedDict
 
+from utils import fast_json
+
 
 def merge_dicts(a: Dict[str, any], b: Dict[str, any]) -> Dict[str, any]:
     return {**a, **b}
@@ -12,7 +13,7 @@ def merge_dicts(a: Dict[str, any], b: Dict[str, any]) -> Dict[str, any]:
 
 # Define agent state
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], operator.add]
+    messages: Annotated[Sequence[BaseMessage], add_messages]
     data: Annotated[Dict[str, any], merge_dicts]
     metadata: Annotated[Dict[str, any], merge_dicts]
 
@@ -37,12 +38,12 @@ def show_agent_reasoning(output, agent_name):
     if isinstance(output, (dict, list)):
         # Convert the output to JSON-serializable format
         serializable_output = convert_to_serializable(output)
-        print(json.dumps(serializable_output, indent=2))
+        print(fast_json.dumps(serializable_output, indent=True))
     else:
         try:
             # Parse the string as JSON and pretty print it
-            parsed_output = json.loads(output)
-            print(json.dumps(parsed_output, indent=2))
-        except json.JSONDecodeError:
+            parsed_output = fast_json.loads(output)
+            print(fast_json.dumps(parsed_output, indent=True))
+        except fast_json.JSONDecodeError:
             # Fallback to original string if not valid JSON
             print(output)
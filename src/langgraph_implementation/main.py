@@ -1,22 +1,22 @@
+import logging
+
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langgraph.graph import END, StateGraph
 
 from agents.captain import captain_agent
-from agents.currents import current_agent, noaa_agent
-from agents.weather import weather_agent
-from agents.wind import wind_agent
+from agents.currents import noaa_agent
+from agents.forecast import forecast_agent
 from graph.state import AgentState, show_agent_reasoning
+from utils import fast_json
 
 # Load environment variables from .env file
 load_dotenv()
 
 
 def parse_final_response(response):
-    import json
-
     try:
-        return json.loads(response)
+        return fast_json.loads(response)
     except:
         print(f"Error parsing response: {response}")
         return None
@@ -64,25 +64,16 @@ def create_workflow():
     workflow = StateGraph(AgentState)
     workflow.add_node("start_node", start)
 
-    ## NOAA Agent->Current->Captain
+    ## NOAA Agent->Forecast->Captain
     workflow.add_node("noaa_agent", noaa_agent)
     workflow.add_edge("start_node", "noaa_agent")
 
-    workflow.add_node("current_agent", current_agent)
-    workflow.add_edge("noaa_agent", "current_agent")
+    # Wind, weather and currents come back from one combined LLM call
+    workflow.add_node("forecast_agent", forecast_agent)
+    workflow.add_edge("noaa_agent", "forecast_agent")
 
     workflow.add_node("captain_agent", captain_agent)
-    workflow.add_edge("current_agent", "captain_agent")
-
-    # Wind->Captain
-    workflow.add_node("wind_agent", wind_agent)
-    workflow.add_edge("start_node", "wind_agent")
-    workflow.add_edge("wind_agent", "captain_agent")
-
-    # Weather->Captain
-    workflow.add_node("weather_agent", weather_agent)
-    workflow.add_edge("start_node", "weather_agent")
-    workflow.add_edge("weather_agent", "captain_agent")
+    workflow.add_edge("forecast_agent", "captain_agent")
 
     workflow.add_edge("captain_agent", END)
 
@@ -91,5 +82,6 @@ def create_workflow():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
     result = run_sail_planner(start_date="03/16/2025")
     show_agent_reasoning(result, "The Captain's Decision")
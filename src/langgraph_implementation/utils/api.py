@@ -1,30 +1,131 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
+import diskcache as dc
+import numpy as np
 import requests
+import requests_cache
+from geopy.adapters import RequestsAdapter
+from geopy.extra.rate_limiter import RateLimiter
+from geopy.geocoders import Nominatim
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from utils import fast_json
 
-def get_tidal_data(noaa_id: int, start_date: str, end_date: str = None):
+# Shared session so repeated NOAA requests reuse the same TCP/TLS connection.
+# Tide predictions for a station and date range don't change, so successful
+# responses are also cached on disk and replayed without touching the network.
+session = requests_cache.CachedSession(
+    "./cache/noaa",
+    expire_after=timedelta(hours=6),
+    allowable_codes=(200,),
+)
+session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+log = logging.getLogger(__name__)
+
+cache = dc.Cache("./cache/api")
+
+# One geocoder for the process so geopy keeps its requests Session between lookups
+geolocator = Nominatim(
+    user_agent="sail-plan-ai/1.0", timeout=5, adapter_factory=RequestsAdapter
+)
+# Nominatim allows at most one request per second
+rate_limited_geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1.0)
+
+NOAA_STATIONS_URL = (
+    "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json"
+)
+
+
+def get_lat_lon(location: str) -> Optional[tuple]:
+    """Convert a location string into latitude and longitude using OpenStreetMap."""
+    cache_key = f"geocode_{location}"
+
+    if cache_key in cache:
+        log.debug("Returning cached geocode.")
+        return cache[cache_key]
+
+    location_data = rate_limited_geocode(location)
+
+    if location_data:
+        geocode = (location_data.latitude, location_data.longitude)
+        cache.set(cache_key, geocode, expire=86400)  # Cache for 1 day
+        return geocode
+    else:
+        log.warning("Could not geocode %r", location)
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_noaa_stations() -> Dict[str, np.ndarray]:
+    """NOAA tide prediction stations as parallel id/name/lat/lon arrays."""
+    response = session.get(
+        NOAA_STATIONS_URL, params={"type": "tidepredictions"}, timeout=(3.05, 10)
+    )
+    response.raise_for_status()
+    stations = fast_json.loads(response.content)["stations"]
+    return {
+        "ids": np.array([station["id"] for station in stations]),
+        "names": np.array([station["name"] for station in stations]),
+        "lat": np.array([station["lat"] for station in stations], dtype=float),
+        "lon": np.array([station["lng"] for station in stations], dtype=float),
+    }
+
+
+def parse_date(date_str: str) -> date:
+    # Dates are always MM/DD/YYYY, so split the fields instead of using strptime
+    month, day, year = date_str.split("/")
+    return date(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=128)
+def noaa_date_range(start_date: str, end_date: str = None) -> Tuple[str, str]:
+    """Convert MM/DD/YYYY dates into NOAA's YYYYMMDD begin/end strings."""
+    converted_start_date = parse_date(start_date)
+    if not end_date:
+        converted_end_date = converted_start_date + timedelta(days=1)
+    else:
+        converted_end_date = parse_date(end_date)
+
+    return f"{converted_start_date:%Y%m%d}", f"{converted_end_date:%Y%m%d}"
+
+
+def get_tidal_data(noaa_id: str, begin_date: str, end_date: str):
     """
     NOAA Station Public API
+
+    Dates are YYYYMMDD strings, see noaa_date_range.
     """
     noaa_root = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-    converted_start_date = datetime.strptime(start_date, "%m/%d/%Y")
-    if not end_date:
-        converted_end_date = converted_start_date + timedelta(days=1)
-    else:
-        converted_end_date = datetime.strptime(end_date, "%m/%d/%Y")
-
-    str_start_date = datetime.strftime(converted_start_date, "%Y%m%d")
-    str_end_date = datetime.strftime(converted_end_date, "%Y%m%d")
-    url = f"""{noaa_root}?product=predictions&station={
-        noaa_id
-    }&datum=MLLW&units=metric&time_zone=gmt&format=json&begin_date={
-        str_start_date
-    }&end_date={str_end_date}"""
-    print("trying to pull NOAA data with the following URL")
-    print(url)
-    station_data = requests.get(url)
+    params = {
+        "product": "predictions",
+        "station": noaa_id,
+        "datum": "MLLW",
+        "units": "metric",
+        "time_zone": "gmt",
+        "format": "json",
+        "begin_date": begin_date,
+        "end_date": end_date,
+    }
+    log.debug("Pulling NOAA data with params %s", params)
+    station_data = session.get(noaa_root, params=params, timeout=(3.05, 10))
     if station_data.status_code == requests.codes.ok:
-        return station_data.status_code, station_data.json()
+        return station_data.status_code, fast_json.loads(station_data.content)
     else:
         return station_data.status_code, {}
@@ -0,0 +1,12 @@
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def dumps(obj, indent: bool = False) -> str:
+    option = orjson.OPT_INDENT_2 if indent else 0
+    return orjson.dumps(obj, option=option).decode()
+
+
+def loads(data):
+    return orjson.loads(data)
@@ -0,0 +1,24 @@
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine_miles(user_location, lats, lons):
+    """Great-circle distance in miles from a location to arrays of lat/lon degrees."""
+    user_lat, user_lon = np.radians(user_location)
+    lats = np.radians(lats)
+    lons = np.radians(lons)
+    a = (
+        np.sin((lats - user_lat) / 2) ** 2
+        + np.cos(user_lat) * np.cos(lats) * np.sin((lons - user_lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def nearest_indices(distances, max_results):
+    """Indices of the smallest distances, closest first, without a full sort."""
+    k = min(max_results, len(distances))
+    if k == 0:
+        return np.empty(0, dtype=int)
+    nearest = np.argpartition(distances, k - 1)[:k]
+    return nearest[np.argsort(distances[nearest])]
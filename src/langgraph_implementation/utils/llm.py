@@ -1,16 +1,32 @@
+import hashlib
+import logging
 import os
+from functools import lru_cache
 from typing import Optional
 
+import diskcache as dc
+from langchain_core.messages import convert_to_openai_messages
 from langchain_openai import ChatOpenAI
+from pydantic import TypeAdapter, ValidationError
 
+log = logging.getLogger(__name__)
 
+cache = dc.Cache("./cache/llm")
+
+# Structured-output wrappers keyed on the pydantic model they parse into
+structured_models = {}
+
+# Pydantic validators for raw JSON, keyed on the pydantic model they build
+type_adapters = {}
+
+
+@lru_cache(maxsize=1)
 def get_model() -> Optional[ChatOpenAI | None]:
     # Get and validate API key
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        # Print error to console
-        print(
-            f"API Key Error: Please make sure OPENAI_API_KEY is set in your .env file."
+        log.error(
+            "API Key Error: Please make sure OPENAI_API_KEY is set in your .env file."
         )
         raise ValueError(
             "OpenAI API key not found.  Please make sure OPENAI_API_KEY is set in your .env file."
@@ -18,13 +34,64 @@ def get_model() -> Optional[ChatOpenAI | None]:
     return ChatOpenAI(model="gpt-4o-mini", api_key=api_key)
 
 
-def call_llm(prompt, pydantic_model):
+def stream_json(prompt) -> Optional[str]:
+    """Stream the completion and return the JSON text, or None if it isn't JSON."""
     llm = get_model()
-
-    llm = llm.with_structured_output(
-        pydantic_model,
-        method="json_mode",
+    # Call the OpenAI client behind ChatOpenAI directly so both share one pool
+    stream = llm.root_client.chat.completions.create(
+        model=llm.model_name,
+        messages=convert_to_openai_messages(prompt.to_messages()),
+        response_format={"type": "json_object"},
+        stream=True,
     )
-    print("Invoking OpenAI")
-    result = llm.invoke(prompt)
+    chunks = []
+    started = False
+    with stream:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content or ""
+            if not started and content.strip():
+                # JSON mode always opens an object; stop paying for anything else
+                if not content.lstrip().startswith("{"):
+                    return None
+                started = True
+            chunks.append(content)
+    return "".join(chunks)
+
+
+def get_structured_model(pydantic_model):
+    # Reuse the shared ChatOpenAI client (and its connection pool) for every agent
+    if pydantic_model not in structured_models:
+        structured_models[pydantic_model] = get_model().with_structured_output(
+            pydantic_model,
+            method="json_mode",
+        )
+    return structured_models[pydantic_model]
+
+
+def get_type_adapter(pydantic_model) -> TypeAdapter:
+    if pydantic_model not in type_adapters:
+        type_adapters[pydantic_model] = TypeAdapter(pydantic_model)
+    return type_adapters[pydantic_model]
+
+
+def call_llm(prompt, pydantic_model):
+    # Identical prompts for the same output model return the cached response
+    cache_key = hashlib.sha256(
+        (pydantic_model.__name__ + prompt.to_string()).encode()
+    ).hexdigest()
+    adapter = get_type_adapter(pydantic_model)
+    if cache_key in cache:
+        log.debug("Returning cached OpenAI response.")
+        return adapter.validate_json(cache[cache_key])
+
+    log.info("Invoking OpenAI")
+    content = stream_json(prompt)
+    try:
+        result = adapter.validate_json(content or "")
+    except ValidationError:
+        log.warning("Streamed response was not valid, retrying with structured output")
+        result = get_structured_model(pydantic_model).invoke(prompt)
+    cache.set(cache_key, result.model_dump_json(), expire=3600)  # Cache for 1 hour
     return result
@@ -1,7 +1,7 @@
-import requests
+import logging
 from typing import Dict, List
-from geopy.distance import geodesic
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pydantic import BaseModel
 import pandas as pd 
 from llama_index.core import SummaryIndex, SimpleDirectoryReader, GPTVectorStoreIndex, Document
@@ -10,11 +10,16 @@ from llama_index.readers.web import SimpleWebPageReader
 from bs4 import BeautifulSoup
 import diskcache as dc 
 import numpy as np
+import orjson
 
 from utils import llm
 from utils import api
+from utils.geo import haversine_miles, nearest_indices
+from utils.http import session
 
 
+log = logging.getLogger(__name__)
+
 cache = dc.Cache("./cache")
 
 
@@ -27,19 +32,20 @@ class NOAAStations(BaseModel):
 def get_noaa_tide_stations():
     """Fetch NOAA station data and extract relevant details."""
 
-    cache_key = "noaa_stations"
+    cache_key = "noaa_tide_stations"
 
     if cache_key in cache:
-        print("Returning cached NOAA tide stations.")
+        log.debug("Returning cached NOAA tide stations.")
         return cache[cache_key]
 
     url = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json"
-    response = requests.get(url)
+    # Only tide prediction stations, instead of the full inventory of every type
+    response = session.get(url, params={"type": "tidepredictions"}, timeout=10)
 
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         stations = data.get("stations", [])  # Extract station list
-        print(stations)
+        log.debug("Fetched %d NOAA tide stations.", len(stations))
         
         # Keep only relevant fields
         filtered_stations = [
@@ -55,7 +61,7 @@ def get_noaa_tide_stations():
         cache.set(cache_key, filtered_stations, expire=86400)  # Cache for 1 day
         return filtered_stations
     else:
-        print(f"Error fetching NOAA data: {response.status_code}")
+        log.warning("Error fetching NOAA data: %s", response.status_code)
         return None
     
 
@@ -66,7 +72,7 @@ def get_noaa_data(station_id: str, start_date: str, end_date: str = None):
     
     # Check if data is in cache
     if cache_key in cache:
-        print("Returning cached NOAA data.")
+        log.debug("Returning cached NOAA data.")
         return cache[cache_key]
 
     try:
@@ -94,13 +100,11 @@ def get_noaa_data(station_id: str, start_date: str, end_date: str = None):
             str_start_date
         }&end_date={str_end_date}"""
 
-        print("NOAA URL")
-        print(url)
-        print(100*"_--")
+        log.debug("NOAA URL: %s", url)
 
-        response = requests.get(url)
+        response = session.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         tide_info = data["predictions"]
 
@@ -109,53 +113,57 @@ def get_noaa_data(station_id: str, start_date: str, end_date: str = None):
 
         return tide_info
     except Exception as e:
-        print(f"Error fetching NOAA tidal data: {e}")
+        log.warning("Error fetching NOAA tidal data: %s", e)
         return {}
 
 
 def get_nearest_stations(user_location, stations, max_results=15):
     """Find the closest NOAA stations to a given location."""
     user_lat, user_lon = user_location
-    # Compute distances
-    stations_with_distance = [
-        {
-            **station,
-            "distance": geodesic((user_lat, user_lon), (station["lat"], station["lon"])).miles
-        }
-        for station in stations
-    ]
+    distances = haversine_miles(
+        user_lat,
+        user_lon,
+        np.array([station["lat"] for station in stations]),
+        np.array([station["lon"] for station in stations]),
+    )
+    nearest = nearest_indices(distances, max_results)
 
-    # Sort by closest distance
-    sorted_stations = sorted(stations_with_distance, key=lambda x: x["distance"])
+    return [{**stations[i], "distance": distances[i]} for i in nearest]
 
-    return sorted_stations#[:max_results]  # Keep only the closest stations
+
+@lru_cache(maxsize=1)
+def load_current_stations():
+    """Load the NOAA current stations table once per process."""
+    station_table = pd.read_csv("data/current_stations.csv")
+    # Longitudes are stored as degrees west
+    station_table["lon"] = station_table["lon"] * -1
+    return station_table
 
 
 def get_noaa_current_stations(lat_lon):
 
     cache_key = "noaa_current_stations"
     if cache_key in cache:
-        print("Returning cached NOAA currents stations.")
+        log.debug("Returning cached NOAA currents stations.")
         return cache[cache_key]
     
     # Not measuring distance well
-    station_table = pd.read_csv("data/current_stations.csv")
-    station_table["lon"] = station_table["lon"] * -1
-    print(100*"=")
-    print(station_table)
-    closest_station = get_nearest_stations(lat_lon, station_table.to_dict(orient='records'))
-
-    # print(closest_station)
-    """
-    not calculating correct distances
-    Convert the latitude and longitude of your location and each station from degrees to radians.
-    """
-    df = pd.DataFrame(closest_station).sort_values(by="distance").head()
-
-    # Convert df to llamaindex document
+    station_table = load_current_stations()
+    log.debug("Loaded %d NOAA current stations.", len(station_table))
+    distances = haversine_miles(
+        *lat_lon, station_table["lat"].to_numpy(), station_table["lon"].to_numpy()
+    )
+    nearest = nearest_indices(distances, 5)
+
+    # Convert the closest stations to llamaindex documents
     documents = [
-        Document(text=row.to_string(), metadata={"index": idx}) 
-        for idx, row in df.iterrows()
+        Document(
+            text=f"{station.name} id={station.id} lat={station.lat} lon={station.lon} dist={distance:.2f}",
+            metadata={"index": idx},
+        )
+        for idx, (station, distance) in enumerate(
+            zip(station_table.iloc[nearest].itertuples(), distances[nearest])
+        )
     ]
 
     # print(df[df["name"].str.contains("Rich")])
@@ -262,7 +270,7 @@ def tides_and_currents(location: str, start_date:str ):
     lat_lon = api.get_lat_lon(location)
 
     if not lat_lon:
-        print("Failed to get geocode. Exiting.")
+        log.warning("Failed to get geocode. Exiting.")
         return
     
     # working here
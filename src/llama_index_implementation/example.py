@@ -1,98 +1,96 @@
-import os
 import json
-import requests
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
-from llama_index.core.llms import ChatMessage
-from llama_index.llms.openai import OpenAI
+import logging
+from dataclasses import asdict, dataclass
+import numpy as np
+import orjson
 from pydantic import BaseModel
 from typing import List, Optional
 from dotenv import load_dotenv
 
+from utils.api import cache, get_lat_lon
+from utils.geo import nearest_in_box
+from utils.http import session
+
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 # NOAA API URL
 NOAA_STATION_API = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json"
 
 
-### ✅ 1. Get Latitude/Longitude from Location
-def get_lat_lon(location: str) -> Optional[tuple]:
-    """Convert a location string into latitude and longitude using OpenStreetMap."""
-    geolocator = Nominatim(user_agent="geoapi")
-    location_data = geolocator.geocode(location)
-    
-    if location_data:
-        return location_data.latitude, location_data.longitude
-    else:
-        print(f"Error: Could not geocode '{location}'")
-        return None
+### ✅ 1. Fetch NOAA Stations
+@dataclass
+class Stations:
+    """NOAA stations stored as parallel arrays, one per field."""
+    ids: np.ndarray
+    names: np.ndarray
+    lat_rad: np.ndarray
+    lon_rad: np.ndarray
 
 
-### ✅ 2. Fetch NOAA Stations
-def get_noaa_stations():
+def get_noaa_stations() -> Optional[Stations]:
     """Fetch NOAA station data and extract relevant details."""
-    response = requests.get(NOAA_STATION_API)
+    cache_key = "noaa_stations_v3"
+
+    if cache_key in cache:
+        log.debug("Returning cached NOAA stations.")
+        return Stations(**cache[cache_key])
+
+    # Ask MDAPI for water level stations only rather than every station type
+    response = session.get(NOAA_STATION_API, params={"type": "waterlevels"}, timeout=10)
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         stations = data.get("stations", [])  # Extract station list
+        if not stations:
+            log.warning("NOAA returned no stations.")
+            return None
         
-        # Keep only relevant fields
-        filtered_stations = [
-            {
-                "id": station["id"],
-                "name": station["name"],
-                "lat": station["lat"],
-                "lon": station["lng"]
-            }
-            for station in stations
-        ]
+        # Keep only relevant fields, with coordinates pre-converted to radians
+        noaa_stations = Stations(
+            ids=np.array([station["id"] for station in stations], dtype=object),
+            names=np.array([station["name"] for station in stations], dtype=object),
+            lat_rad=np.radians(
+                np.fromiter((station["lat"] for station in stations), dtype=float)
+            ),
+            lon_rad=np.radians(
+                np.fromiter((station["lng"] for station in stations), dtype=float)
+            ),
+        )
         
-        return filtered_stations
+        cache.set(cache_key, asdict(noaa_stations), expire=86400)  # Cache for 1 day
+        return noaa_stations
     else:
-        print(f"Error fetching NOAA data: {response.status_code}")
+        log.warning("Error fetching NOAA data: %s", response.status_code)
         return None
 
 
-### ✅ 3. Filter Closest NOAA Stations
-def get_nearest_stations(user_location, stations, max_results=15):
+### ✅ 2. Filter Closest NOAA Stations
+def get_nearest_stations(user_location, stations: Stations, max_results=15):
     """Find the closest NOAA stations to a given location."""
-    user_lat, user_lon = user_location
+    user_lat, user_lon = np.radians(user_location)
+    nearest, distances = nearest_in_box(
+        user_lat, user_lon, stations.lat_rad, stations.lon_rad, max_results
+    )
 
-    # Compute distances
-    stations_with_distance = [
-        {
-            **station,
-            "distance": geodesic((user_lat, user_lon), (station["lat"], station["lon"])).miles
-        }
-        for station in stations
+    return [
+        {"id": station_id, "name": name, "distance": distance}
+        for station_id, name, distance in zip(
+            stations.ids[nearest], stations.names[nearest], distances
+        )
     ]
 
-    # Sort by closest distance
-    sorted_stations = sorted(stations_with_distance, key=lambda x: x["distance"])
-
-    return sorted_stations[:max_results]  # Keep only the closest stations
-
 
-### ✅ 4. Initialize LLM
-def get_model() -> Optional[OpenAI]:
-    """Initialize OpenAI LLM with API Key."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("API Key Error: Please set OPENAI_API_KEY in your .env file.")
-        raise ValueError("OpenAI API key not found.")
-    return OpenAI(model="gpt-4o-mini", api_key=api_key)
-
-
-### ✅ 5. LLM Structuring
+### ✅ 3. Station Results
 class NOAAStations(BaseModel):
     station_ids: List[str]
     station_names: List[str]
     station_distances: List[float]
 
 
-### ✅ 6. Run Full Pipeline
+### ✅ 4. Run Full Pipeline
 def main():
     # Step 1: Get Geocode
     location = "Port Orchard Marina, Port Orchard, Washington"
@@ -108,40 +106,20 @@ def main():
         print("Failed to fetch NOAA data. Exiting.")
         return
 
-    # Step 3: Get Nearest Stations
-    closest_stations = get_nearest_stations(lat_lon, stations)
+    # Step 3: Get the 8 Nearest Stations, already ordered by distance
+    closest_stations = get_nearest_stations(lat_lon, stations, max_results=8)
 
-    # Step 4: Format for LLM
-    stations_text = "\n".join(
-        [f"{s['id']} - {s['name']} ({s['distance']:.1f} miles)" for s in closest_stations]
+    # Step 4: Package the result (no LLM needed to rank a distance sort)
+    resp = NOAAStations(
+        station_ids=[s["id"] for s in closest_stations],
+        station_names=[s["name"] for s in closest_stations],
+        station_distances=[s["distance"] for s in closest_stations],
     )
-
-    # Step 5: Call LLM
-    llm = get_model()
-    messages = [
-        ChatMessage(
-            role="system",
-            content=f"""Here is a list of NOAA water level stations near {location}:
-            {stations_text}
-
-            Find the 8 closest stations and return them in this JSON format:
-            {{
-                "station_ids": List[str],
-                "station_names": List[str],
-                "station_distances": List[float]  # Distance in miles
-            }}
-            """,
-        ),
-    ]
-
-    try:
-        resp = llm.as_structured_llm(output_cls=NOAAStations).chat(messages)
-        print(resp)
-    except Exception as e:
-        print(f"Error in LLM response: {e}")
+    print(resp)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
     main()
 
 
@@ -149,49 +127,33 @@ if __name__ == "__main__":
 ### WEATHER AGENT ###
 #####################
 
-import os
-import requests
-from geopy.geocoders import Nominatim
 from llama_index.core.llms import ChatMessage
-from llama_index.llms.openai import OpenAI
+import orjson
 from pydantic import BaseModel
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import List
 
-# Load environment variables
-load_dotenv()
+from utils.api import get_lat_lon
+from utils.http import session
+from utils.llm import call_llm
 
 
-### ✅ 1. Get Latitude/Longitude from Location
-def get_lat_lon(location: str) -> Optional[tuple]:
-    """Convert a location string into latitude and longitude using OpenStreetMap."""
-    geolocator = Nominatim(user_agent="geoapi")
-    location_data = geolocator.geocode(location)
-    
-    if location_data:
-        return location_data.latitude, location_data.longitude
-    else:
-        print(f"Error: Could not geocode '{location}'")
-        return None
-
-
-### ✅ 2. Get NOAA Weather Forecast
+### ✅ 1. Get NOAA Weather Forecast
 def get_noaa_weather(lat, lon):
     """Fetch weather forecast from NOAA Weather API."""
     try:
         # Get NOAA forecast office & grid data
         url = f"https://api.weather.gov/points/{lat},{lon}"
-        response = requests.get(url)
+        response = session.get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Extract forecast URL
         forecast_url = data["properties"]["forecast"]
         
         # Get the actual weather forecast
-        forecast_response = requests.get(forecast_url)
+        forecast_response = session.get(forecast_url, timeout=5)
         forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        forecast_data = orjson.loads(forecast_response.content)
         
         # Extract relevant forecast details
         periods = forecast_data["properties"]["periods"][:3]  # Next 3 periods
@@ -210,11 +172,11 @@ def get_noaa_weather(lat, lon):
         return weather_info
     
     except Exception as e:
-        print(f"Error fetching NOAA weather data: {e}")
+        log.warning("Error fetching NOAA weather data: %s", e)
         return None
 
 
-### ✅ 3. Define Weather Data Model
+### ✅ 2. Define Weather Data Model
 class WeatherForecast(BaseModel):
     name: List[str]  # Time period (e.g., "Tonight", "Monday")
     temperature: List[int]  # Temp values
@@ -224,17 +186,7 @@ class WeatherForecast(BaseModel):
     short_forecast: List[str]  # Summary (e.g., "Partly Cloudy")
 
 
-### ✅ 4. Initialize LLM
-def get_model() -> Optional[OpenAI]:
-    """Initialize OpenAI LLM with API Key."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("API Key Error: Please set OPENAI_API_KEY in your .env file.")
-        raise ValueError("OpenAI API key not found.")
-    return OpenAI(model="gpt-4o-mini", api_key=api_key)
-
-
-### ✅ 5. Run WeatherAgent
+### ✅ 3. Run WeatherAgent
 def main():
     location = "Port Orchard Marina, Port Orchard, Washington"
     lat_lon = get_lat_lon(location)
@@ -256,7 +208,6 @@ def main():
     )
 
     # Call LLM
-    llm = get_model()
     messages = [
         ChatMessage(
             role="system",
@@ -276,11 +227,8 @@ def main():
         ),
     ]
 
-    try:
-        resp = llm.as_structured_llm(output_cls=WeatherForecast).chat(messages)
-        print(resp)
-    except Exception as e:
-        print(f"Error in LLM response: {e}")
+    resp = call_llm(messages, WeatherForecast)
+    print(resp)
 
 
 if __name__ == "__main__":
@@ -293,12 +241,8 @@ if __name__ == "__main__":
 import json
 from typing import Dict
 from llama_index.core.llms import ChatMessage
-from llama_index.llms.openai import OpenAI
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
+from utils.llm import get_model
 
 
 ### ✅ 1. Simulated Data Retrieval
@@ -320,16 +264,7 @@ def get_weather_data() -> Dict:
     }
 
 
-### ✅ 2. Initialize LLM
-def get_model() -> OpenAI:
-    """Initialize OpenAI model for decision making."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OpenAI API key not found.")
-    return OpenAI(model="gpt-4o-mini", api_key=api_key)
-
-
-### ✅ 3. Define Decision Function
+### ✅ 2. Define Decision Function
 def captain_decision():
     """Decides if it's safe to sail based on NOAA & weather data."""
     
@@ -366,39 +301,49 @@ def captain_decision():
 
     try:
         response = llm.chat(messages)
-        print(response)
+        log.info("Captain decision: %s", response)
         return response
     except Exception as e:
-        print(f"Error in decision making: {e}")
+        log.error("Error in decision making: %s", e)
         return None
 
 
-### ✅ 4. Run CaptainAgent
+### ✅ 3. Run CaptainAgent
 if __name__ == "__main__":
     captain_decision()
 
 ######################
 ## IMPROVED VERSION ##
 ######################
+import asyncio
 import json
-import os
+import threading
+import time
 from typing import Dict
-import requests
 from llama_index.core.llms import ChatMessage
-from llama_index.llms.openai import OpenAI
-from dotenv import load_dotenv
+import orjson
 
-# Load environment variables
-load_dotenv()
+from utils.api import cache
+from utils.http import session
+from utils.llm import get_model
+
+# weather.gov forecasts update at most hourly: serve cached ones as-is for 15
+# minutes, then serve them while refreshing in the background up to an hour old
+WEATHER_FRESH_SECONDS = 900
+WEATHER_STALE_SECONDS = 3600
+
+# Cache keys with a background refresh in flight, so stale hits don't pile up fetches
+weather_refreshes = set()
+weather_refreshes_lock = threading.Lock()
 
 ### ✅ 1. Get Real Data from NOAAAgent
 def get_noaa_data(station_id: str) -> Dict:
     """Fetch tides and current data from NOAAAgent."""
     try:
         url = f"https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?product=predictions&datum=MLLW&station={station_id}&time_zone=lst_ldt&units=english&interval=hilo&format=json"
-        response = requests.get(url)
+        response = session.get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         # Extract tide cycle (last and next high/low tide)
         tide_predictions = data["predictions"]
@@ -409,26 +354,70 @@ def get_noaa_data(station_id: str) -> Dict:
         return tide_info
 
     except Exception as e:
-        print(f"Error fetching NOAA tidal data: {e}")
+        log.warning("Error fetching NOAA tidal data: %s", e)
         return None
 
 
 ### ✅ 2. Get Real Data from WeatherAgent
 def get_weather_data(lat: float, lon: float) -> Dict:
+    """Weather forecast with stale-while-revalidate caching."""
+    cache_key = f"weather_{lat:.3f}_{lon:.3f}"
+    cached = cache.get(cache_key)
+
+    if cached:
+        fetched_at, weather_info = cached
+        age = time.time() - fetched_at
+        if age < WEATHER_FRESH_SECONDS:
+            log.debug("Returning cached weather forecast.")
+            return weather_info
+        if age < WEATHER_STALE_SECONDS:
+            log.debug("Returning cached weather forecast, refreshing in background.")
+            with weather_refreshes_lock:
+                already_refreshing = cache_key in weather_refreshes
+                weather_refreshes.add(cache_key)
+            if not already_refreshing:
+                threading.Thread(
+                    target=refresh_weather_in_background,
+                    args=(cache_key, lat, lon),
+                    daemon=True,
+                ).start()
+            return weather_info
+
+    return refresh_weather_data(cache_key, lat, lon)
+
+
+def refresh_weather_data(cache_key: str, lat: float, lon: float) -> Dict:
+    """Fetch the forecast and store it with its fetch time."""
+    weather_info = fetch_weather_data(lat, lon)
+    if weather_info:
+        cache.set(cache_key, (time.time(), weather_info), expire=WEATHER_STALE_SECONDS)
+    return weather_info
+
+
+def refresh_weather_in_background(cache_key: str, lat: float, lon: float):
+    """Refresh the forecast, then let the next stale hit start another refresh."""
+    try:
+        refresh_weather_data(cache_key, lat, lon)
+    finally:
+        with weather_refreshes_lock:
+            weather_refreshes.discard(cache_key)
+
+
+def fetch_weather_data(lat: float, lon: float) -> Dict:
     """Fetch weather forecast from NOAA Weather API."""
     try:
         url = f"https://api.weather.gov/points/{lat},{lon}"
-        response = requests.get(url)
+        response = session.get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         # Extract forecast URL
         forecast_url = data["properties"]["forecast"]
 
         # Get the actual forecast
-        forecast_response = requests.get(forecast_url)
+        forecast_response = session.get(forecast_url, timeout=5)
         forecast_response.raise_for_status()
-        forecast_data = forecast_response.json()
+        forecast_data = orjson.loads(forecast_response.content)
 
         # Extract relevant forecast details (next 12 hours)
         periods = forecast_data["properties"]["periods"][:2]
@@ -442,29 +431,28 @@ def get_weather_data(lat: float, lon: float) -> Dict:
         return weather_info
 
     except Exception as e:
-        print(f"Error fetching NOAA weather data: {e}")
+        log.warning("Error fetching NOAA weather data: %s", e)
         return None
 
 
-### ✅ 3. Initialize LLM
-def get_model() -> OpenAI:
-    """Initialize OpenAI model for decision making."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OpenAI API key not found.")
-    return OpenAI(model="gpt-4o-mini", api_key=api_key)
+### ✅ 3. Fetch Tide & Weather Data Concurrently
+async def fetch_conditions(station_id: str, lat: float, lon: float):
+    """Fetch tides and weather at the same time instead of one after the other."""
+    async with asyncio.TaskGroup() as tg:
+        noaa_task = tg.create_task(asyncio.to_thread(get_noaa_data, station_id))
+        weather_task = tg.create_task(asyncio.to_thread(get_weather_data, lat, lon))
+    return noaa_task.result(), weather_task.result()
 
 
 ### ✅ 4. Define Captain Decision Function
-def captain_decision(station_id: str, lat: float, lon: float):
+async def captain_decision(station_id: str, lat: float, lon: float):
     """Decides if it's safe to sail based on real NOAA & weather data."""
     
     # Get real data
-    noaa_data = get_noaa_data(station_id)
-    weather_data = get_weather_data(lat, lon)
+    noaa_data, weather_data = await fetch_conditions(station_id, lat, lon)
 
     if not noaa_data or not weather_data:
-        print("Error fetching data. Cannot make decision.")
+        log.warning("Error fetching data. Cannot make decision.")
         return None
 
     # Extract tide cycle info
@@ -510,11 +498,11 @@ def captain_decision(station_id: str, lat: float, lon: float):
     messages = [ChatMessage(role="system", content=input_text)]
 
     try:
-        response = llm.chat(messages)
-        print(response)
+        response = await llm.achat(messages)
+        log.info("Captain decision: %s", response)
         return response
     except Exception as e:
-        print(f"Error in decision making: {e}")
+        log.error("Error in decision making: %s", e)
         return None
 
 
@@ -523,6 +511,6 @@ if __name__ == "__main__":
     station_id = "9445958"  # Example: Port Orchard, WA
     lat, lon = 47.5404, -122.6361  # Example coordinates
 
-    captain_decision(station_id, lat, lon)
+    asyncio.run(captain_decision(station_id, lat, lon))
 
 
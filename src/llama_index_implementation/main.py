@@ -1,3 +1,5 @@
+import logging
+
 from dotenv import load_dotenv
 
 from agents.noaa_currents_agent import tides_and_currents
@@ -15,4 +17,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
     main()
\ No newline at end of file
@@ -1,25 +1,38 @@
+import logging
+from functools import lru_cache
+from geopy.adapters import RequestsAdapter
+from geopy.extra.rate_limiter import RateLimiter
 from geopy.geocoders import Nominatim
 from typing import Optional
 import diskcache as dc
 
 
+log = logging.getLogger(__name__)
+
 cache = dc.Cache("./cache")
 
+# One geocoder for the process so geopy keeps its requests Session between lookups
+geolocator = Nominatim(
+    user_agent="sail-plan-ai/1.0", timeout=5, adapter_factory=RequestsAdapter
+)
+# Nominatim allows at most one request per second
+rate_limited_geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1.0)
+
+@lru_cache(maxsize=1024)
 def get_lat_lon(location: str) -> Optional[tuple]:
     """Convert a location string into latitude and longitude using OpenStreetMap."""
     cache_key = f"geocode_{location}"
-    
+
     if cache_key in cache:
-        print("Returning cached geocode.")
+        log.debug("Returning cached geocode.")
         return cache[cache_key]
-    
-    geolocator = Nominatim(user_agent="geoapi")
-    location_data = geolocator.geocode(location)
-    
+
+    location_data = rate_limited_geocode(location)
+
     if location_data:
         geocode = (location_data.latitude, location_data.longitude)
         cache.set(cache_key, geocode, expire=86400)  # Cache for 1 day
         return geocode
     else:
-        print(f"Error: Could not geocode '{location}'")
+        log.warning("Could not geocode %r", location)
         return None
\ No newline at end of file
@@ -0,0 +1,65 @@
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles between degree coordinates (scalars or arrays)."""
+    return haversine_miles_rad(*map(np.radians, (lat1, lon1, lat2, lon2)))
+
+
+def haversine_miles_rad(phi1, lambda1, phi2, lambda2):
+    """Great-circle distance in miles between radian coordinates (scalars or arrays)."""
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin((lambda2 - lambda1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def nearest_indices(distances, max_results):
+    """Indices of the smallest distances, closest first, without a full sort."""
+    k = min(max_results, len(distances))
+    if k == 0:
+        return np.empty(0, dtype=int)
+    nearest = np.argpartition(distances, k - 1)[:k]
+    return nearest[np.argsort(distances[nearest])]
+
+
+def nearest_in_box(phi, lam, lat_rad, lon_rad, max_results, half_width=np.radians(2.0)):
+    """Closest points to (phi, lam) in radians, only measuring those in a box around it.
+
+    The box doubles until the k-th result is provably nearer than anything outside.
+    Returns (indices, distances in miles), closest first.
+    """
+    k = min(max_results, len(lat_rad))
+    if k == 0:
+        return np.empty(0, dtype=int), np.empty(0)
+    while True:
+        # Widen the longitude window so it spans half_width even at the box's far edge
+        edge_cos = np.cos(min(abs(phi) + half_width, np.pi / 2))
+        lon_half_width = half_width / edge_cos if edge_cos > 0.05 else np.pi
+        # Wrap longitude differences into [-pi, pi) so boxes can cross the antimeridian
+        dlon = np.abs((lon_rad - lam + np.pi) % (2 * np.pi) - np.pi)
+        candidates = np.flatnonzero(
+            (np.abs(lat_rad - phi) < half_width) & (dlon < lon_half_width)
+        )
+        # Lower bound on the distance to any point outside the box: past the latitude
+        # edge it is half_width; past the longitude edge, cos(lat) >= edge_cos at both
+        # ends, so sin(d / 2) >= edge_cos * sin(dlon / 2)
+        outside = half_width
+        if lon_half_width < np.pi:
+            lon_gap = 2 * np.arcsin(edge_cos * np.sin(lon_half_width / 2))
+            outside = min(outside, lon_gap)
+        if len(candidates) >= k:
+            distances = haversine_miles_rad(
+                phi, lam, lat_rad[candidates], lon_rad[candidates]
+            )
+            nearest = nearest_indices(distances, k)
+            if distances[nearest[-1]] <= EARTH_RADIUS_MILES * outside:
+                return candidates[nearest], distances[nearest]
+        if half_width >= np.pi:
+            distances = haversine_miles_rad(phi, lam, lat_rad, lon_rad)
+            nearest = nearest_indices(distances, k)
+            return nearest, distances[nearest]
+        half_width = min(half_width * 2, np.pi)
@@ -1,15 +1,22 @@
+import logging
 import os
+from functools import lru_cache
 from typing import Optional
 from llama_index.llms.openai import OpenAI
 
+log = logging.getLogger(__name__)
 
+# Structured-output wrappers keyed on the pydantic class they parse into
+structured_models = {}
+
+
+@lru_cache(maxsize=1)
 def get_model() -> Optional[OpenAI]:
     # Get and validate API key
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        # Print error to console
-        print(
-            f"API Key Error: Please make sure OPENAI_API_KEY is set in your .env file."
+        log.error(
+            "API Key Error: Please make sure OPENAI_API_KEY is set in your .env file."
         )
         raise ValueError(
             "OpenAI API key not found.  Please make sure OPENAI_API_KEY is set in your .env file."
@@ -17,9 +24,18 @@ def get_model() -> Optional[OpenAI]:
     return OpenAI(model="gpt-4o-mini", api_key=api_key)
 
 
-def call_llm(prompt, llm, output_data_cls):
+def get_structured_model(output_data_cls):
+    # Build each structured wrapper once on the shared OpenAI client
+    if output_data_cls not in structured_models:
+        structured_models[output_data_cls] = get_model().as_structured_llm(
+            output_cls=output_data_cls
+        )
+    return structured_models[output_data_cls]
+
+
+def call_llm(prompt, output_data_cls):
     try:
-        resp = llm.as_structured_llm(output_cls=output_data_cls).chat(prompt)
-        print(resp)
+        return get_structured_model(output_data_cls).chat(prompt)
     except Exception as e:
-        print(f"Error in LLM response: {e}")
\ No newline at end of file
+        log.warning("Error in LLM response: %s", e)
+        return None
\ No newline at end of file
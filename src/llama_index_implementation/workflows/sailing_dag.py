@@ -14,7 +14,8 @@ def build_sailing_dag():
     decision_task = Task(make_decision)
 
     # Define task dependencies (order of execution)
-    graph.add_edge(noaa_task, weather_task)  # NOAA data is required before weather
+    # NOAA and weather fetches are independent, so both feed the decision directly
+    graph.add_edge(noaa_task, decision_task)  # NOAA data is required for decision
     graph.add_edge(weather_task, decision_task)  # Weather data is required for decision
 
     # Execute the graph